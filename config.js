@@ -94,7 +94,7 @@ const AppConfig = {
     readyCheckInterval: 100
   },
   database: {
-    version: '1.0.0',
+    version: '1.3.0',
     getConfigSignature() {
       const criticalParams = {
         orb: AppConfig.orb,
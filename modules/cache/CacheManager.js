@@ -1,12 +1,13 @@
 /**
- * CacheManager - IndexedDB storage for albums, videos, and vocabulary trees
+ * CacheManager - IndexedDB storage for albums, videos, vocabulary trees and
+ * per-image features
  * Handles persistent caching with TTL support
  */
 
 class CacheManager {
   constructor() {
     this.dbName = 'WebarAlbumCache';
-    this.dbVersion = 1;
+    this.dbVersion = 2;
     this.db = null;
     this.cacheTTL = 7 * 24 * 60 * 60 * 1000; // 7 days in milliseconds
 
@@ -14,7 +15,8 @@ class CacheManager {
     this.stores = {
       albums: 'albums',          // Album zip files
       contents: 'contents',      // Extracted images/videos
-      vocabulary: 'vocabulary'   // Vocabulary trees
+      vocabulary: 'vocabulary',  // Vocabulary trees
+      features: 'features'       // Per-image features keyed by content hash
     };
   }
 
@@ -30,10 +32,23 @@ class CacheManager {
         reject(request.error);
       };
 
+      request.onblocked = () => {
+        // Another tab holds an older version open; build without the cache
+        console.error('[Cache] IndexedDB upgrade blocked by another open tab');
+        reject(new Error('IndexedDB upgrade blocked by another open tab'));
+      };
+
       request.onsuccess = () => {
         this.db = request.result;
         console.log('[Cache] IndexedDB opened successfully');
 
+        // Let a newer version in another tab upgrade the schema
+        this.db.onversionchange = () => {
+          console.log('[Cache] IndexedDB version change, closing connection');
+          this.db.close();
+          this.db = null;
+        };
+
         // Clean up expired cache entries
         this.cleanExpiredEntries();
 
@@ -67,6 +82,15 @@ class CacheManager {
           vocabStore.createIndex('timestamp', 'timestamp', { unique: false });
         }
 
+        if (!db.objectStoreNames.contains(this.stores.features)) {
+          const featureStore = db.createObjectStore(this.stores.features, {
+            keyPath: 'hash'
+          });
+          featureStore.createIndex('timestamp', 'timestamp', {
+            unique: false
+          });
+        }
+
         console.log('[Cache] IndexedDB schema created');
       };
     });
@@ -381,6 +405,68 @@ class CacheManager {
     });
   }
 
+  /**
+   * Store extracted features for one image
+   * @param {string} hash - Content hash of the image (plus extraction config)
+   * @param {Object} features - Keypoints, descriptors and sizes
+   */
+  async storeFeatures(hash, features) {
+    if (!this.db) await this.init();
+
+    return new Promise((resolve, reject) => {
+      const transaction = this.db.transaction([this.stores.features],
+        'readwrite');
+      const store = transaction.objectStore(this.stores.features);
+
+      const data = {
+        hash,
+        features,
+        timestamp: Date.now()
+      };
+
+      const request = store.put(data);
+
+      request.onsuccess = () => resolve();
+
+      request.onerror = () => {
+        console.error('[Cache] Failed to store features:', request.error);
+        reject(request.error);
+      };
+    });
+  }
+
+  /**
+   * Retrieve extracted features for one image
+   * @param {string} hash - Content hash of the image (plus extraction config)
+   * @returns {Promise<Object|null>} Cached features or null
+   */
+  async getFeatures(hash) {
+    if (!this.db) await this.init();
+
+    return new Promise((resolve, reject) => {
+      const transaction = this.db.transaction([this.stores.features],
+        'readonly');
+      const store = transaction.objectStore(this.stores.features);
+      const request = store.get(hash);
+
+      request.onsuccess = () => {
+        const result = request.result;
+
+        if (!result || Date.now() - result.timestamp > this.cacheTTL) {
+          resolve(null);
+          return;
+        }
+
+        resolve(result.features);
+      };
+
+      request.onerror = () => {
+        console.error('[Cache] Failed to get features:', request.error);
+        reject(request.error);
+      };
+    });
+  }
+
   /**
    * Clean up expired cache entries across all stores
    */
@@ -403,7 +489,7 @@ class CacheManager {
             const age = now - cursor.value.timestamp;
             if (age > this.cacheTTL) {
               console.log(`[Cache] Cleaning expired ${storeName}:`,
-                cursor.value.albumCode);
+                cursor.primaryKey);
               cursor.delete();
             }
             cursor.continue();
@@ -448,6 +534,7 @@ class CacheManager {
       albums: { count: 0, size: 0 },
       contents: { count: 0 },
       vocabulary: { count: 0 },
+      features: { count: 0 },
       total: 0
     };
 
@@ -495,6 +582,19 @@ class CacheManager {
         };
       });
 
+      // Get cached feature count
+      const featureTransaction = this.db.transaction([this.stores.features],
+        'readonly');
+      const featureStore = featureTransaction.objectStore(this.stores.features);
+      const featureRequest = featureStore.count();
+
+      await new Promise((resolve) => {
+        featureRequest.onsuccess = () => {
+          stats.features.count = featureRequest.result;
+          resolve();
+        };
+      });
+
       return stats;
     } catch (error) {
       console.error('[Cache] Failed to get cache stats:', error);
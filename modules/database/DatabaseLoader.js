@@ -73,8 +73,10 @@ class DatabaseLoader {
    * @returns {Object} Runtime target format
    */
   convertToRuntimeFormat(dbTarget) {
-    // Convert descriptors from array of int arrays to OpenCV Mat format
-    const descriptors = this.convertDescriptors(dbTarget.descriptors);
+    // Convert descriptors from packed block or array of int arrays to OpenCV Mat format
+    const descriptors = Array.isArray(dbTarget.descriptors)
+      ? this.convertDescriptors(dbTarget.descriptors)
+      : this.convertPackedDescriptors(dbTarget.descriptors);
     const keypoints = this.convertKeypoints(dbTarget.keypoints);
 
     // Create a dummy image Mat with correct dimensions for corner calculations
@@ -167,6 +169,23 @@ class DatabaseLoader {
     return mat;
   }
 
+  /**
+   * Convert a packed descriptor block to OpenCV Mat
+   * @param {Object} block - Packed block {shape: [numDescriptors, descriptorSize], dtype, data}
+   * @returns {cv.Mat} OpenCV Mat with descriptors
+   */
+  convertPackedDescriptors(block) {
+    const [numDescriptors, descriptorSize] = block.shape;
+    if (numDescriptors === 0) {
+      return new cv.Mat();
+    }
+
+    const mat = new cv.Mat(numDescriptors, descriptorSize, cv.CV_8U);
+    mat.data.set(VocabularyBuilder.fromPackedBlock(block));
+
+    return mat;
+  }
+
   /**
    * Get all targets in runtime format
    * @returns {Array<Object>} Runtime-formatted targets
@@ -204,15 +223,21 @@ class DatabaseLoader {
    * Initialize vocabulary tree query system
    */
   initializeVocabularyQuery() {
-    if (!this.database?.vocabulary?.words || !this.database?.vocabulary?.idf_weights) {
+    const vocabularyData = this.database?.vocabulary;
+    if (!vocabularyData?.words || !vocabularyData?.idf_weights) {
       console.warn('Vocabulary or IDF not found in database, skipping query initialization');
       return;
     }
 
     try {
-      // Convert vocabulary words (arrays) to the format needed
-      const vocabulary = this.database.vocabulary.words;
-      const idf = this.database.vocabulary.idf_weights;
+      // Convert vocabulary words (packed or arrays) to the format needed
+      const vocabulary = Array.isArray(vocabularyData.words)
+        ? vocabularyData.words
+        : VocabularyBuilder.unpackRows(
+          VocabularyBuilder.fromPackedBlock(vocabularyData.words),
+          vocabularyData.words.shape[1]
+        );
+      const idf = vocabularyData.idf_weights;
 
       // Create vocabulary query
       this.vocabularyQuery = new VocabularyTreeQuery(vocabulary, idf);
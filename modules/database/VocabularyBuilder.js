@@ -20,10 +20,18 @@ class VocabularyBuilder {
     this.maxFeaturesPerTarget = options.maxFeaturesPerTarget || AppConfig.vocabulary.maxFeaturesPerTarget;
 
     this.vocabulary = null;
+    this.vocabularyFlat = null; // Packed copy of vocabulary words
     this.vocabularyTree = null; // Hierarchical tree structure
+    this.treeIndex = null; // Packed tree with word offsets for quantization
     this.idfWeights = null;
     this.targets = [];
 
+    // Popcount lookup table: number of set bits for every byte value
+    this.popcountLUT = new Uint8Array(256);
+    for (let i = 1; i < 256; i++) {
+      this.popcountLUT[i] = (i & 1) + this.popcountLUT[i >> 1];
+    }
+
     // ORB detector params (must match live detector in FeatureDetector.js)
     this.orbParams = {
       nfeatures: AppConfig.orb.nfeatures,
@@ -45,6 +53,9 @@ class VocabularyBuilder {
 
     this.onProgress = options.onProgress || (() => {});
 
+    // Per-clustering logs and cluster quality metrics (debug only)
+    this.verbose = options.verbose || false;
+
     // Cache manager for storing vocabulary trees
     this.cacheManager = null;
     this.albumCode = options.albumCode || null;
@@ -174,12 +185,11 @@ class VocabularyBuilder {
   }
 
   /**
-   * Extract features from an image using ORB detector and TEBLID descriptor
-   * @param {cv.Mat} imageMat - OpenCV Mat in grayscale
-   * @param {string} targetId - Identifier for this target
-   * @returns {Object} Feature data
+   * Create ORB detector + TEBLID descriptor pair
+   * Caller owns the returned OpenCV objects and must delete() them
+   * @returns {Object} {detector, descriptor}
    */
-  extractFeatures(imageMat, targetId) {
+  _createFeatureExtractor() {
     // ORB detector for keypoint detection
     const detector = new cv.ORB(
       this.orbParams.nfeatures,
@@ -202,6 +212,20 @@ class VocabularyBuilder {
       teblidSizeConstant
     );
 
+    return { detector, descriptor };
+  }
+
+  /**
+   * Extract features from an image using ORB detector and TEBLID descriptor
+   * @param {cv.Mat} imageMat - OpenCV Mat in grayscale
+   * @param {string} targetId - Identifier for this target
+   * @param {Object} extractor - Optional shared {detector, descriptor} pair
+   * @returns {Object} Feature data
+   */
+  extractFeatures(imageMat, targetId, extractor = null) {
+    const ownsExtractor = !extractor;
+    const { detector, descriptor } = extractor || this._createFeatureExtractor();
+
     const keypoints = new cv.KeyPointVector();
     const descriptors = new cv.Mat();
 
@@ -211,24 +235,27 @@ class VocabularyBuilder {
 
     if (descriptors.rows === 0) {
       console.warn(`No features found for ${targetId}`);
-      detector.delete();
-      descriptor.delete();
+      if (ownsExtractor) {
+        detector.delete();
+        descriptor.delete();
+      }
       keypoints.delete();
       descriptors.delete();
       return null;
     }
 
-    // Convert to arrays for processing
-    const keypointsArray = [];
-    const responsesArray = [];
-    for (let i = 0; i < keypoints.size(); i++) {
+    // Convert to arrays for processing (one get() per keypoint)
+    const numKeypoints = keypoints.size();
+    const keypointsArray = new Array(numKeypoints);
+    const responses = new Float32Array(numKeypoints);
+    for (let i = 0; i < numKeypoints; i++) {
       const kp = keypoints.get(i);
-      keypointsArray.push({
+      keypointsArray[i] = {
         x: kp.pt.x,
         y: kp.pt.y,
         response: kp.response
-      });
-      responsesArray.push(kp.response);
+      };
+      responses[i] = kp.response;
     }
 
     // Save descriptor size and image size before we delete anything
@@ -236,16 +263,14 @@ class VocabularyBuilder {
     const imageWidth = imageMat.cols;
     const imageHeight = imageMat.rows;
 
-    // Convert descriptors to Uint8Array (copy data before deletion)
+    // Convert descriptors to Uint8Array (bulk copy before deletion)
     const totalBytes = descriptors.rows * descriptorSize;
-    const descriptorsArray = new Uint8Array(totalBytes);
-    for (let i = 0; i < totalBytes; i++) {
-      descriptorsArray[i] = descriptors.data[i];
-    }
+    const descriptorsArray = descriptors.data.slice(0, totalBytes);
 
     // Feature selection (keep best distributed features)
     const selected = this._selectBestFeatures(
       keypointsArray,
+      responses,
       descriptorsArray,
       descriptorSize,
       { width: imageWidth, height: imageHeight }
@@ -254,50 +279,115 @@ class VocabularyBuilder {
     console.log(`  ${targetId}: ${selected.keypoints.length} features`);
 
     // Clean up OpenCV objects
-    detector.delete();
-    descriptor.delete();
+    if (ownsExtractor) {
+      detector.delete();
+      descriptor.delete();
+    }
     keypoints.delete();
     descriptors.delete();
 
     return {
       id: targetId,
       keypoints: selected.keypoints,
-      descriptors: selected.descriptors,
+      descriptors: this._asAlignedBytes(selected.descriptors),
       descriptorSize: descriptorSize,
       numFeatures: selected.keypoints.length,
       imageSize: { width: imageWidth, height: imageHeight }
     };
   }
 
+  /**
+   * Look up cached features for an image
+   * Cache key is the SHA-1 of the preprocessed image bytes plus everything
+   * that affects extraction, so edited images or changed params miss
+   * @param {string|null} hash - Feature cache key from _computeFeatureCacheKey
+   * @returns {Promise<Object>} {hash, features} - features is null on a miss
+   */
+  async _lookupCachedFeatures(hash) {
+    if (hash) {
+      try {
+        const features = await this.cacheManager.getFeatures(hash);
+        return { hash, features };
+      } catch (error) {
+        console.error('[VocabularyBuilder] Feature cache lookup failed:', error);
+      }
+    }
+
+    return { hash, features: null };
+  }
+
+  /**
+   * Store extracted features in the cache (errors are logged, not thrown)
+   * @param {string} hash - Feature cache key
+   * @param {Object} features - Feature data from extractFeatures
+   */
+  async _storeCachedFeatures(hash, features) {
+    try {
+      const { id, ...cacheable } = features;
+      await this.cacheManager.storeFeatures(hash, cacheable);
+    } catch (error) {
+      console.error('[VocabularyBuilder] Failed to cache features:', error);
+    }
+  }
+
+  /**
+   * Compute feature cache key for an image
+   * @param {cv.Mat} imageMat - OpenCV Mat in grayscale
+   * @returns {Promise<string|null>} Key, or null if hashing is unavailable
+   */
+  async _computeFeatureCacheKey(imageMat) {
+    if (typeof crypto === 'undefined' || !crypto.subtle) {
+      return null;
+    }
+
+    try {
+      // Copy out of the WASM heap: digest() rejects shared memory (threaded build)
+      const digest = await crypto.subtle.digest('SHA-1', imageMat.data.slice());
+      const hex = Array.from(new Uint8Array(digest))
+        .map(b => b.toString(16).padStart(2, '0'))
+        .join('');
+      // Database version covers changes to the extraction/selection code itself
+      const version = AppConfig.database.version;
+      const signature = AppConfig.database.getConfigSignature();
+      return `${hex}-${imageMat.cols}x${imageMat.rows}-${this.maxFeaturesPerTarget}-v${version}-${signature}`;
+    } catch (error) {
+      console.error('[VocabularyBuilder] Failed to hash image:', error);
+      return null;
+    }
+  }
+
   /**
    * Select best features using spatial distribution + response filtering
    * Mimics BRISK's selectivity by keeping only strong features
    */
-  _selectBestFeatures(keypoints, descriptorsFlat, descriptorSize, imageSize) {
+  _selectBestFeatures(keypoints, responses, descriptorsFlat, descriptorSize, imageSize) {
     if (keypoints.length <= this.maxFeaturesPerTarget) {
       return { keypoints, descriptors: descriptorsFlat };
     }
 
     const { width, height } = imageSize;
+    const n = keypoints.length;
 
     // STEP 1: Filter by response strength (keep top 60%)
     // This mimics BRISK's selectivity - only strong corners
-    const sortedByResponse = keypoints
-      .map((kp, i) => ({ index: i, response: kp.response, x: kp.x, y: kp.y }))
-      .sort((a, b) => b.response - a.response);
+    const order = new Uint32Array(n);
+    for (let i = 0; i < n; i++) order[i] = i;
+    order.sort((a, b) => responses[b] - responses[a]);
 
     // Calculate response threshold (60th percentile)
-    const responseThresholdIdx = Math.floor(sortedByResponse.length * 0.4);
-    const responseThreshold = sortedByResponse[responseThresholdIdx]?.response || 0;
+    const responseThresholdIdx = Math.floor(n * 0.4);
+    const responseThreshold = responses[order[responseThresholdIdx]] || 0;
 
-    console.log(`  Response filtering: ${sortedByResponse.length} → ${sortedByResponse.filter(f => f.response > responseThreshold).length} features (threshold: ${responseThreshold.toFixed(1)})`);
+    // Keep only strong features (prefix of the sorted order)
+    let numStrong = 0;
+    while (numStrong < n && responses[order[numStrong]] > responseThreshold) {
+      numStrong++;
+    }
+    const strongIndices = order.subarray(0, numStrong);
 
-    // Keep only strong features
-    const strongFeatures = sortedByResponse.filter(f => f.response > responseThreshold);
+    console.log(`  Response filtering: ${n} → ${numStrong} features (threshold: ${responseThreshold.toFixed(1)})`);
 
     // STEP 2: Spatial distribution on filtered features
-    const indices = strongFeatures;
-
     // Spatial grid for distribution
     const gridSize = 4;
     const cellW = width / gridSize;
@@ -306,18 +396,28 @@ class VocabularyBuilder {
       this.maxFeaturesPerTarget / (gridSize * gridSize)
     );
 
+    // Grid cell of every strong feature, computed once
+    const cellIds = new Int32Array(numStrong);
+    for (let i = 0; i < numStrong; i++) {
+      const kp = keypoints[strongIndices[i]];
+      const cellX = Math.min(Math.floor(kp.x / cellW), gridSize - 1);
+      const cellY = Math.min(Math.floor(kp.y / cellH), gridSize - 1);
+      cellIds[i] = cellY * gridSize + cellX;
+    }
+
     const selected = [];
-    const cellCounts = Array(gridSize).fill(0).map(() => Array(gridSize).fill(0));
+    const isSelected = new Uint8Array(n);
+    const cellCounts = new Int32Array(gridSize * gridSize);
 
     // First pass: distribute across grid
-    for (const { index } of indices) {
-      const kp = keypoints[index];
-      const cellX = Math.min(Math.floor(kp.x / cellW), gridSize - 1);
-      const cellY = Math.min(Math.floor(kp.y / cellH), gridSize - 1);
+    for (let i = 0; i < numStrong; i++) {
+      const cell = cellIds[i];
 
-      if (cellCounts[cellY][cellX] < featuresPerCell) {
+      if (cellCounts[cell] < featuresPerCell) {
+        const index = strongIndices[i];
         selected.push(index);
-        cellCounts[cellY][cellX]++;
+        isSelected[index] = 1;
+        cellCounts[cell]++;
 
         if (selected.length >= this.maxFeaturesPerTarget) break;
       }
@@ -325,9 +425,11 @@ class VocabularyBuilder {
 
     // Second pass: fill remaining with strongest
     if (selected.length < this.maxFeaturesPerTarget) {
-      for (const { index } of indices) {
-        if (!selected.includes(index)) {
+      for (let i = 0; i < numStrong; i++) {
+        const index = strongIndices[i];
+        if (!isSelected[index]) {
           selected.push(index);
+          isSelected[index] = 1;
           if (selected.length >= this.maxFeaturesPerTarget) break;
         }
       }
@@ -341,7 +443,7 @@ class VocabularyBuilder {
       const srcOffset = selected[i] * descriptorSize;
       const dstOffset = i * descriptorSize;
       selectedDescriptors.set(
-        descriptorsFlat.slice(srcOffset, srcOffset + descriptorSize),
+        descriptorsFlat.subarray(srcOffset, srcOffset + descriptorSize),
         dstOffset
       );
     }
@@ -354,14 +456,11 @@ class VocabularyBuilder {
 
   /**
    * Build hierarchical vocabulary tree using recursive k-means clustering
-   * @param {Array} allDescriptors - Array of descriptor Uint8Arrays
+   * @param {Uint8Array} allDescriptors - Flat array of all target descriptors
    * @param {number} descriptorSize - Bytes per descriptor
    */
   async buildVocabulary(allDescriptors, descriptorSize) {
-    const totalDescriptors = allDescriptors.reduce(
-      (sum, desc) => sum + desc.length / descriptorSize,
-      0
-    );
+    const totalDescriptors = allDescriptors.length / descriptorSize;
 
     console.log(`Building hierarchical vocabulary tree:`);
     console.log(`  Branching factor: ${this.k}`);
@@ -403,6 +502,8 @@ class VocabularyBuilder {
 
     // Extract flat vocabulary from leaf nodes for backward compatibility
     this.vocabulary = this._extractLeafNodes(this.vocabularyTree);
+    this.vocabularyFlat = this._packVocabulary(this.vocabulary, descriptorSize);
+    this.treeIndex = this._buildTreeIndex(this.vocabularyTree);
 
     console.log(`Vocabulary tree built: ${this.vocabulary.length} words (${this.levels} levels)`);
     this.onProgress({ stage: 'clustering', progress: 100 });
@@ -447,33 +548,44 @@ class VocabularyBuilder {
       20 // Moderate iterations for internal nodes
     );
 
+    // Count cluster sizes so each child's descriptors can be packed directly
+    const clusterSizes = new Int32Array(this.k);
+    for (let j = 0; j < n; j++) {
+      clusterSizes[kmeans.assignments[j]]++;
+    }
+
     // Create child nodes for each cluster
+    // Centers of empty clusters are dropped so centers[i] always leads to children[i]
+    const centers = [];
     const children = [];
     for (let i = 0; i < this.k; i++) {
+      // Skip empty clusters
+      if (clusterSizes[i] === 0) {
+        continue;
+      }
+
       // Collect descriptors assigned to this cluster
-      const clusterDescriptors = [];
+      const childDescriptors = new Uint8Array(clusterSizes[i] * descriptorSize);
+      let dstOffset = 0;
       for (let j = 0; j < n; j++) {
         if (kmeans.assignments[j] === i) {
           const offset = j * descriptorSize;
-          clusterDescriptors.push(
-            ...descriptorsFlat.slice(offset, offset + descriptorSize)
+          childDescriptors.set(
+            descriptorsFlat.subarray(offset, offset + descriptorSize),
+            dstOffset
           );
+          dstOffset += descriptorSize;
         }
       }
 
-      // Skip empty clusters
-      if (clusterDescriptors.length === 0) {
-        continue;
-      }
-
       // Recursively build subtree
-      const childDescriptors = new Uint8Array(clusterDescriptors);
       const childNode = await this._buildHierarchicalTree(
         childDescriptors,
         descriptorSize,
         currentLevel + 1
       );
 
+      centers.push(kmeans.centers[i]);
       children.push(childNode);
 
       // Update progress
@@ -489,7 +601,7 @@ class VocabularyBuilder {
     return {
       level: currentLevel,
       isLeaf: false,
-      centers: kmeans.centers,
+      centers: centers,
       children: children
     };
   }
@@ -516,26 +628,30 @@ class VocabularyBuilder {
     return leaves;
   }
 
+  /**
+   * Pack vocabulary words into one contiguous buffer
+   * @param {Array<Uint8Array>} words - Vocabulary words
+   * @param {number} descriptorSize - Bytes per descriptor
+   * @returns {Uint8Array} Flat array of V * descriptorSize bytes
+   */
+  _packVocabulary(words, descriptorSize) {
+    const packed = new Uint8Array(words.length * descriptorSize);
+    for (let i = 0; i < words.length; i++) {
+      packed.set(words[i], i * descriptorSize);
+    }
+    return packed;
+  }
+
   /**
    * Sample descriptors for clustering (constant complexity)
    * Ensures vocabulary building time is predictable
    */
   _sampleDescriptors(allDescriptors, descriptorSize, maxSamples) {
-    // Calculate total number of descriptors
-    const totalDescriptors = allDescriptors.reduce(
-      (sum, desc) => sum + desc.length / descriptorSize,
-      0
-    );
+    const totalDescriptors = allDescriptors.length / descriptorSize;
 
-    // If we have fewer descriptors than maxSamples, use all
+    // If we have fewer descriptors than maxSamples, use all (no copy)
     if (totalDescriptors <= maxSamples) {
-      const combined = new Uint8Array(totalDescriptors * descriptorSize);
-      let offset = 0;
-      for (const desc of allDescriptors) {
-        combined.set(desc, offset);
-        offset += desc.length;
-      }
-      return combined;
+      return allDescriptors;
     }
 
     // Otherwise, randomly sample descriptors
@@ -549,33 +665,13 @@ class VocabularyBuilder {
 
     // Extract sampled descriptors
     const indices = Array.from(sampleIndices).sort((a, b) => a - b);
-    let sampledIdx = 0;
 
     for (let i = 0; i < indices.length; i++) {
-      const globalIdx = indices[i];
-
-      // Find which descriptor array this index belongs to
-      let currentIdx = globalIdx;
-      let descriptorArray = null;
-
-      for (const desc of allDescriptors) {
-        const numDesc = desc.length / descriptorSize;
-        if (currentIdx < numDesc) {
-          descriptorArray = desc;
-          break;
-        }
-        currentIdx -= numDesc;
-      }
-
-      if (descriptorArray) {
-        const srcOffset = currentIdx * descriptorSize;
-        const dstOffset = sampledIdx * descriptorSize;
-        sampled.set(
-          descriptorArray.slice(srcOffset, srcOffset + descriptorSize),
-          dstOffset
-        );
-        sampledIdx++;
-      }
+      const srcOffset = indices[i] * descriptorSize;
+      sampled.set(
+        allDescriptors.subarray(srcOffset, srcOffset + descriptorSize),
+        i * descriptorSize
+      );
     }
 
     return sampled;
@@ -724,8 +820,9 @@ class VocabularyBuilder {
   }
 
   /**
-   * K-means clustering for binary descriptors using Hamming distance
-   * Uses median voting for cluster center updates (optimal for binary data)
+   * K-majority clustering for binary descriptors using Hamming distance
+   * Works directly on packed bytes: k-means++ seeding, Hamming assignment and
+   * per-bit majority vote for center updates (optimal for binary data)
    * @param {Uint8Array} descriptorsFlat - Flat array of binary descriptors
    * @param {number} descriptorSize - Bytes per descriptor
    * @param {number} k - Number of clusters
@@ -733,24 +830,21 @@ class VocabularyBuilder {
    */
   async _kMeansClusteringBinary(descriptorsFlat, descriptorSize, k, maxIterations = 30) {
     const n = descriptorsFlat.length / descriptorSize;
-
-    console.log(`Running binary k-means with Hamming distance:`);
-    console.log(`  Descriptors: ${n}`);
-    console.log(`  Clusters: ${k}`);
-    console.log(`  Descriptor size: ${descriptorSize} bytes`);
-
-    // Initialize centers randomly by selecting k random descriptors
-    const centerIndices = new Set();
-    while (centerIndices.size < k) {
-      centerIndices.add(Math.floor(Math.random() * n));
+    const wordsPerDesc = descriptorSize / 4;
+    const descWords = this._asWords(descriptorsFlat);
+
+    if (this.verbose) {
+      console.log(`Running binary k-majority with Hamming distance:`);
+      console.log(`  Descriptors: ${n}`);
+      console.log(`  Clusters: ${k}`);
+      console.log(`  Descriptor size: ${descriptorSize} bytes`);
     }
 
-    let centers = Array.from(centerIndices).map(i => {
-      const offset = i * descriptorSize;
-      return new Uint8Array(descriptorsFlat.slice(offset, offset + descriptorSize));
-    });
+    // Packed centers (k * descriptorSize bytes), seeded with k-means++
+    const centersFlat = this._kMeansPlusPlusInit(descriptorsFlat, descriptorSize, k);
+    const centerWords = this._asWords(centersFlat);
 
-    let assignments = new Array(n).fill(0);
+    const assignments = new Int32Array(n);
     let changed = true;
     let iteration = 0;
     let prevChangedCount = n;
@@ -762,14 +856,16 @@ class VocabularyBuilder {
 
       // Assignment step: assign each descriptor to nearest center using Hamming distance
       for (let i = 0; i < n; i++) {
-        const descOffset = i * descriptorSize;
-        const descriptor = descriptorsFlat.slice(descOffset, descOffset + descriptorSize);
-
+        const descOffset = i * wordsPerDesc;
         let minDist = Infinity;
         let bestCluster = 0;
 
         for (let j = 0; j < k; j++) {
-          const dist = this._hammingDistance(descriptor, centers[j]);
+          const centerOffset = j * wordsPerDesc;
+          let dist = 0;
+          for (let w = 0; w < wordsPerDesc; w++) {
+            dist += this._popcount32(descWords[descOffset + w] ^ centerWords[centerOffset + w]);
+          }
           if (dist < minDist) {
             minDist = dist;
             bestCluster = j;
@@ -784,41 +880,26 @@ class VocabularyBuilder {
 
       // Early termination: stop if very few points changed
       if (changedCount < earlyStopThreshold) {
-        console.log(`  Binary k-means early stop: only ${changedCount} points changed`);
+        if (this.verbose) {
+          console.log(`  Binary k-majority early stop: only ${changedCount} points changed`);
+        }
         changed = false;
         break;
       }
 
       // Check if we're making progress (diminishing returns)
       if (changedCount >= prevChangedCount * 0.95 && iteration > 5) {
-        console.log(`  Binary k-means early stop: minimal progress (${changedCount} changes)`);
+        if (this.verbose) {
+          console.log(`  Binary k-majority early stop: minimal progress (${changedCount} changes)`);
+        }
         changed = false;
         break;
       }
 
       prevChangedCount = changedCount;
 
-      // Update step: recalculate centers using median voting (optimal for binary)
-      for (let j = 0; j < k; j++) {
-        // Collect all descriptors in this cluster
-        const clusterDescriptors = [];
-        for (let i = 0; i < n; i++) {
-          if (assignments[i] === j) {
-            const descOffset = i * descriptorSize;
-            clusterDescriptors.push(
-              descriptorsFlat.slice(descOffset, descOffset + descriptorSize)
-            );
-          }
-        }
-
-        // Skip empty clusters
-        if (clusterDescriptors.length === 0) {
-          continue;
-        }
-
-        // Compute new center using median voting (bit-wise majority)
-        centers[j] = this._medianVotingCenter(clusterDescriptors, descriptorSize);
-      }
+      // Update step: bit-wise majority vote over each cluster's members
+      this._majorityVoteCenters(descriptorsFlat, descriptorSize, assignments, k, centersFlat);
 
       // Progress update
       if (iteration % 3 === 0) {
@@ -830,55 +911,139 @@ class VocabularyBuilder {
       }
     }
 
-    console.log(`  Binary k-means converged in ${iteration} iterations`);
+    const centers = [];
+    for (let j = 0; j < k; j++) {
+      centers.push(centersFlat.slice(j * descriptorSize, (j + 1) * descriptorSize));
+    }
 
-    // Compute cluster quality metrics
-    const metrics = this._computeClusterQuality(descriptorsFlat, descriptorSize, centers, assignments);
-    console.log(`  Cluster quality metrics:`);
-    console.log(`    Intra-cluster distance (avg): ${metrics.intraCluster.toFixed(2)}`);
-    console.log(`    Inter-cluster distance (avg): ${metrics.interCluster.toFixed(2)}`);
-    console.log(`    Separation ratio: ${metrics.separationRatio.toFixed(2)} (higher is better)`);
+    // Cluster quality metrics cost an extra pass over all descriptors plus
+    // O(k^2) center pairs per tree node, so only compute them when debugging
+    let metrics = null;
+    if (this.verbose) {
+      console.log(`  Binary k-majority converged in ${iteration} iterations`);
+
+      metrics = this._computeClusterQuality(descriptorsFlat, descriptorSize, centers, assignments);
+      console.log(`  Cluster quality metrics:`);
+      console.log(`    Intra-cluster distance (avg): ${metrics.intraCluster.toFixed(2)}`);
+      console.log(`    Inter-cluster distance (avg): ${metrics.interCluster.toFixed(2)}`);
+      console.log(`    Separation ratio: ${metrics.separationRatio.toFixed(2)} (higher is better)`);
+    }
 
     return { centers, assignments, metrics };
   }
 
   /**
-   * Compute cluster center using median voting (bit-wise majority)
-   * For each bit position, set to 1 if majority of descriptors have it set
-   * This is optimal for binary descriptors
-   * @param {Array<Uint8Array>} descriptors - Array of binary descriptors
+   * k-means++ seeding on packed binary descriptors
+   * Each new center is drawn with probability proportional to the squared
+   * Hamming distance to the nearest center chosen so far
+   * @param {Uint8Array} descriptorsFlat - Flat array of binary descriptors
    * @param {number} descriptorSize - Bytes per descriptor
-   * @returns {Uint8Array} - New center descriptor
+   * @param {number} k - Number of clusters
+   * @returns {Uint8Array} Packed centers (k * descriptorSize bytes)
    */
-  _medianVotingCenter(descriptors, descriptorSize) {
-    const n = descriptors.length;
-    const newCenter = new Uint8Array(descriptorSize);
-
-    // For each byte position
-    for (let byteIdx = 0; byteIdx < descriptorSize; byteIdx++) {
-      let byte = 0;
-
-      // For each bit in the byte
-      for (let bit = 0; bit < 8; bit++) {
-        let onesCount = 0;
-
-        // Count how many descriptors have this bit set
-        for (const desc of descriptors) {
-          if (desc[byteIdx] & (1 << (7 - bit))) {
-            onesCount++;
-          }
+  _kMeansPlusPlusInit(descriptorsFlat, descriptorSize, k) {
+    const n = descriptorsFlat.length / descriptorSize;
+    const wordsPerDesc = descriptorSize / 4;
+    const descWords = this._asWords(descriptorsFlat);
+    const centersFlat = new Uint8Array(k * descriptorSize);
+    const centerWords = this._asWords(centersFlat);
+    const minDists = new Float64Array(n).fill(Infinity);
+
+    let chosen = Math.floor(Math.random() * n);
+
+    for (let c = 0; c < k; c++) {
+      const srcOffset = chosen * descriptorSize;
+      const centerOffset = c * descriptorSize;
+      centersFlat.set(
+        descriptorsFlat.subarray(srcOffset, srcOffset + descriptorSize),
+        centerOffset
+      );
+
+      if (c === k - 1) break;
+
+      // Update squared distance to nearest chosen center
+      const centerWordOffset = c * wordsPerDesc;
+      let total = 0;
+      for (let i = 0; i < n; i++) {
+        const descOffset = i * wordsPerDesc;
+        let dist = 0;
+        for (let w = 0; w < wordsPerDesc; w++) {
+          dist += this._popcount32(descWords[descOffset + w] ^ centerWords[centerWordOffset + w]);
         }
+        const sq = dist * dist;
+        if (sq < minDists[i]) minDists[i] = sq;
+        total += minDists[i];
+      }
 
-        // Set bit if majority have it
-        if (onesCount > n / 2) {
-          byte |= (1 << (7 - bit));
+      // All remaining points coincide with a center: fall back to uniform pick
+      if (total === 0) {
+        chosen = Math.floor(Math.random() * n);
+        continue;
+      }
+
+      let target = Math.random() * total;
+      chosen = n - 1;
+      for (let i = 0; i < n; i++) {
+        target -= minDists[i];
+        if (target <= 0) {
+          chosen = i;
+          break;
         }
       }
+    }
+
+    return centersFlat;
+  }
+
+  /**
+   * Recompute centers by bit-wise majority vote (in place)
+   * One pass over the descriptors accumulates per-cluster bit counts;
+   * a bit is set when more than half of the cluster members have it set.
+   * Empty clusters keep their previous center.
+   * @param {Uint8Array} descriptorsFlat - Flat array of binary descriptors
+   * @param {number} descriptorSize - Bytes per descriptor
+   * @param {Int32Array} assignments - Cluster index per descriptor
+   * @param {number} k - Number of clusters
+   * @param {Uint8Array} centersFlat - Packed centers to update
+   */
+  _majorityVoteCenters(descriptorsFlat, descriptorSize, assignments, k, centersFlat) {
+    const n = assignments.length;
+    const bitsPerDesc = descriptorSize * 8;
+    const bitCounts = new Int32Array(k * bitsPerDesc);
+    const clusterSizes = new Int32Array(k);
+
+    for (let i = 0; i < n; i++) {
+      const cluster = assignments[i];
+      const descOffset = i * descriptorSize;
+      const countOffset = cluster * bitsPerDesc;
+      clusterSizes[cluster]++;
 
-      newCenter[byteIdx] = byte;
+      for (let byteIdx = 0; byteIdx < descriptorSize; byteIdx++) {
+        const byte = descriptorsFlat[descOffset + byteIdx];
+        if (byte === 0) continue;
+        const bitOffset = countOffset + byteIdx * 8;
+        for (let bit = 0; bit < 8; bit++) {
+          bitCounts[bitOffset + bit] += (byte >> (7 - bit)) & 1;
+        }
+      }
     }
 
-    return newCenter;
+    for (let j = 0; j < k; j++) {
+      const size = clusterSizes[j];
+      if (size === 0) continue;
+
+      const countOffset = j * bitsPerDesc;
+      for (let byteIdx = 0; byteIdx < descriptorSize; byteIdx++) {
+        const bitOffset = countOffset + byteIdx * 8;
+        let byte = 0;
+        for (let bit = 0; bit < 8; bit++) {
+          if (bitCounts[bitOffset + bit] > size / 2) {
+            byte |= (1 << (7 - bit));
+          }
+        }
+        centersFlat[j * descriptorSize + byteIdx] = byte;
+      }
+    }
   }
 
   /**
@@ -899,7 +1064,7 @@ class VocabularyBuilder {
 
     for (let i = 0; i < n; i++) {
       const descOffset = i * descriptorSize;
-      const descriptor = descriptorsFlat.slice(descOffset, descOffset + descriptorSize);
+      const descriptor = descriptorsFlat.subarray(descOffset, descOffset + descriptorSize);
       const cluster = assignments[i];
       const dist = this._hammingDistance(descriptor, centers[cluster]);
       intraClusterSum += dist;
@@ -954,8 +1119,12 @@ class VocabularyBuilder {
    */
   quantizeDescriptor(descriptor) {
     // If tree is available, use hierarchical quantization (FAST)
-    if (this.vocabularyTree) {
-      return this._quantizeDescriptorHierarchical(descriptor, this.vocabularyTree, 0);
+    if (this.treeIndex) {
+      return this._quantizeDescriptorHierarchical(
+        this._asWords(descriptor),
+        0,
+        descriptor.length / 4
+      );
     }
 
     // Fallback to flat quantization (SLOW) for backward compatibility
@@ -963,81 +1132,83 @@ class VocabularyBuilder {
   }
 
   /**
-   * Hierarchical quantization - traverse tree from root to leaf
-   * @param {Uint8Array} descriptor - Binary descriptor
-   * @param {Object} node - Current tree node
-   * @param {number} wordOffset - Offset for word ID calculation
+   * Build packed tree index for quantization
+   * Each node gets its centers packed as 32-bit words and the ID of its first
+   * leaf word, so descending the tree needs no per-query word counting
+   * @param {Object} node - Tree node (centers as Uint8Arrays or plain arrays)
+   * @param {number} wordOffset - Word ID of the first leaf under this node
+   * @returns {Object} Indexed node {isLeaf, wordOffset, numWords, numCenters, centerWords, children}
+   */
+  _buildTreeIndex(node, wordOffset = 0) {
+    const numCenters = node.centers.length;
+    const descriptorSize = node.centers[0].length;
+    const centersFlat = new Uint8Array(numCenters * descriptorSize);
+    node.centers.forEach((center, i) => centersFlat.set(center, i * descriptorSize));
+
+    const indexed = {
+      isLeaf: node.isLeaf,
+      wordOffset,
+      numWords: numCenters,
+      numCenters,
+      centerWords: new Uint32Array(centersFlat.buffer),
+      children: null
+    };
+
+    if (!node.isLeaf) {
+      indexed.children = [];
+      indexed.numWords = 0;
+      for (const child of node.children || []) {
+        const indexedChild = this._buildTreeIndex(child, wordOffset + indexed.numWords);
+        indexed.numWords += indexedChild.numWords;
+        indexed.children.push(indexedChild);
+      }
+    }
+
+    return indexed;
+  }
+
+  /**
+   * Hierarchical quantization - descend from root to leaf
+   * At each level only the node's k centers are compared
+   * @param {Uint32Array} descWords - Descriptor(s) as 32-bit words
+   * @param {number} descOffset - Word offset of the descriptor
+   * @param {number} wordsPerDesc - Words per descriptor
    * @returns {number} Word ID
    */
-  _quantizeDescriptorHierarchical(descriptor, node, wordOffset) {
-    // If leaf node, find best matching word among leaf centers
-    if (node.isLeaf) {
+  _quantizeDescriptorHierarchical(descWords, descOffset, wordsPerDesc) {
+    let node = this.treeIndex;
+
+    while (node) {
+      const centerWords = node.centerWords;
       let minDist = Infinity;
-      let bestLocalIdx = 0;
+      let bestIdx = 0;
 
-      for (let i = 0; i < node.centers.length; i++) {
-        const dist = this._hammingDistance(descriptor, node.centers[i]);
+      for (let i = 0; i < node.numCenters; i++) {
+        const centerOffset = i * wordsPerDesc;
+        let dist = 0;
+        for (let w = 0; w < wordsPerDesc; w++) {
+          dist += this._popcount32(descWords[descOffset + w] ^ centerWords[centerOffset + w]);
+        }
         if (dist < minDist) {
           minDist = dist;
-          bestLocalIdx = i;
+          bestIdx = i;
         }
       }
 
-      return wordOffset + bestLocalIdx;
-    }
-
-    // Internal node: find best matching child center
-    let minDist = Infinity;
-    let bestChildIdx = 0;
-
-    for (let i = 0; i < node.centers.length; i++) {
-      const dist = this._hammingDistance(descriptor, node.centers[i]);
-      if (dist < minDist) {
-        minDist = dist;
-        bestChildIdx = i;
+      // Leaf node: best center is the vocabulary word
+      if (node.isLeaf) {
+        return node.wordOffset + bestIdx;
       }
-    }
 
-    // Calculate word offset for the chosen subtree
-    // Each child subtree contains k^(levels-currentLevel-1) words
-    let subtreeSize = 0;
-    if (node.children && node.children.length > 0) {
-      // Count words in previous siblings
-      for (let i = 0; i < bestChildIdx && i < node.children.length; i++) {
-        subtreeSize += this._countWords(node.children[i]);
+      // Shouldn't happen, but fall back to the subtree's first word
+      if (!node.children || !node.children[bestIdx]) {
+        return node.wordOffset;
       }
-    }
 
-    // Recurse into best matching child
-    if (node.children && node.children[bestChildIdx]) {
-      return this._quantizeDescriptorHierarchical(
-        descriptor,
-        node.children[bestChildIdx],
-        wordOffset + subtreeSize
-      );
+      node = node.children[bestIdx];
     }
 
-    // Shouldn't reach here, but return offset as fallback
-    return wordOffset;
-  }
-
-  /**
-   * Count total vocabulary words in a subtree
-   * @param {Object} node - Tree node
-   * @returns {number} Number of words
-   */
-  _countWords(node) {
-    if (node.isLeaf) {
-      return node.centers.length;
-    }
-
-    let count = 0;
-    if (node.children) {
-      for (const child of node.children) {
-        count += this._countWords(child);
-      }
-    }
-    return count;
+    return 0;
   }
 
   /**
@@ -1061,19 +1232,129 @@ class VocabularyBuilder {
     return bestWord;
   }
 
+  /**
+   * Quantize all descriptors of a target in one pass
+   * Walks the flat buffer by offset instead of slicing every descriptor
+   * @param {Uint8Array} descriptors - Flat array of binary descriptors
+   * @param {number} descriptorSize - Bytes per descriptor
+   * @returns {Int32Array} Word ID for each descriptor
+   */
+  _quantizeDescriptors(descriptors, descriptorSize) {
+    const numDesc = descriptors.length / descriptorSize;
+
+    if (this.treeIndex) {
+      const wordsPerDesc = descriptorSize / 4;
+      const descWords = this._asWords(descriptors);
+      const wordIds = new Int32Array(numDesc);
+      for (let i = 0; i < numDesc; i++) {
+        wordIds[i] = this._quantizeDescriptorHierarchical(
+          descWords,
+          i * wordsPerDesc,
+          wordsPerDesc
+        );
+      }
+      return wordIds;
+    }
+
+    return this._quantizeDescriptorsFlat(descriptors, descriptorSize);
+  }
+
+  /**
+   * Batched flat quantization - nearest vocabulary word for every descriptor
+   * XOR + 32-bit popcount, min-reduced over the vocabulary.
+   * Descriptors are processed in blocks so the block and its running minima
+   * stay cache-resident while the packed vocabulary is streamed once per block
+   * @param {Uint8Array} descriptors - Flat array of binary descriptors
+   * @param {number} descriptorSize - Bytes per descriptor
+   * @returns {Int32Array} Word ID for each descriptor
+   */
+  _quantizeDescriptorsFlat(descriptors, descriptorSize) {
+    const numDesc = descriptors.length / descriptorSize;
+    const wordsPerDesc = descriptorSize / 4;
+    const descWords = this._asWords(descriptors);
+    const vocabWords = this._asWords(this.vocabularyFlat);
+    const numWords = this.vocabularyFlat.length / descriptorSize;
+    const wordIds = new Int32Array(numDesc);
+
+    const blockSize = 64; // 64 descriptors x 64 bytes = 4KB per block
+    const minDists = new Int32Array(blockSize);
+
+    for (let start = 0; start < numDesc; start += blockSize) {
+      const end = Math.min(start + blockSize, numDesc);
+      minDists.fill(0x7fffffff);
+
+      for (let j = 0; j < numWords; j++) {
+        const wordOffset = j * wordsPerDesc;
+
+        for (let i = start; i < end; i++) {
+          const descOffset = i * wordsPerDesc;
+          let dist = 0;
+          for (let w = 0; w < wordsPerDesc; w++) {
+            dist += this._popcount32(descWords[descOffset + w] ^ vocabWords[wordOffset + w]);
+          }
+          if (dist < minDists[i - start]) {
+            minDists[i - start] = dist;
+            wordIds[i] = j;
+          }
+        }
+      }
+    }
+
+    return wordIds;
+  }
+
+  /**
+   * Number of set bits in a 32-bit integer (SWAR popcount)
+   * @param {number} x - 32-bit value
+   * @returns {number} Set bit count
+   */
+  _popcount32(x) {
+    x = x - ((x >>> 1) & 0x55555555);
+    x = (x & 0x33333333) + ((x >>> 2) & 0x33333333);
+    x = (x + (x >>> 4)) & 0x0f0f0f0f;
+    return Math.imul(x, 0x01010101) >>> 24;
+  }
+
+  /**
+   * View packed descriptor bytes as 32-bit words for the batched kernels
+   * Descriptor sizes are multiples of 4 bytes (ORB/TEBLID: 32 or 64);
+   * unaligned views are copied into a fresh buffer
+   * @param {Uint8Array} bytes - Packed descriptor bytes
+   * @returns {Uint32Array} Word view over the same bytes
+   */
+  _asWords(bytes) {
+    if (bytes.length % 4 !== 0) {
+      throw new Error(`Descriptor buffer of ${bytes.length} bytes is not word-sized`);
+    }
+    bytes = this._asAlignedBytes(bytes);
+    return new Uint32Array(bytes.buffer, bytes.byteOffset, bytes.length >> 2);
+  }
+
+  /**
+   * Ensure a descriptor buffer is a Uint8Array starting on a 4-byte boundary
+   * Producers call this so the batched kernels can view it as 32-bit words
+   * without copying; misaligned or non-Uint8Array input is copied once
+   * @param {ArrayLike<number>} bytes - Descriptor bytes
+   * @returns {Uint8Array} Aligned descriptor bytes
+   */
+  _asAlignedBytes(bytes) {
+    if (!(bytes instanceof Uint8Array)) {
+      return new Uint8Array(bytes);
+    }
+    if (bytes.byteOffset % 4 !== 0) {
+      return bytes.slice();
+    }
+    return bytes;
+  }
+
   /**
    * Hamming distance between two binary descriptors
    */
   _hammingDistance(a, b) {
+    const lut = this.popcountLUT;
     let dist = 0;
     for (let i = 0; i < a.length; i++) {
-      const xor = a[i] ^ b[i];
-      // Count set bits
-      let count = xor;
-      count = count - ((count >> 1) & 0x55);
-      count = (count & 0x33) + ((count >> 2) & 0x33);
-      count = (count + (count >> 4)) & 0x0f;
-      dist += count;
+      dist += lut[a[i] ^ b[i]];
     }
     return dist;
   }
@@ -1082,38 +1363,147 @@ class VocabularyBuilder {
    * Convert descriptors to Bag-of-Words
    */
   descriptorsToBoW(descriptors, descriptorSize) {
-    const bow = {};
-    const numDesc = descriptors.length / descriptorSize;
+    const row = this._computeBoWRow(descriptors, descriptorSize);
+    return this._rowToObject(row.wordIds, row.counts);
+  }
+
+  /**
+   * Quantize descriptors into a sparse BoW row
+   * @param {Uint8Array} descriptors - Flat array of binary descriptors
+   * @param {number} descriptorSize - Bytes per descriptor
+   * @returns {Object} {wordIds, counts} - non-zero words in ascending order
+   */
+  _computeBoWRow(descriptors, descriptorSize) {
+    const wordIds = this._quantizeDescriptors(descriptors, descriptorSize);
+
+    // Histogram into a dense count array, then keep only non-zero words
+    const dense = new Int32Array(this._numWords());
+    let nnz = 0;
+    for (let i = 0; i < wordIds.length; i++) {
+      if (dense[wordIds[i]]++ === 0) nnz++;
+    }
+
+    const rowWordIds = new Int32Array(nnz);
+    const rowCounts = new Int32Array(nnz);
+    for (let wordId = 0, j = 0; wordId < dense.length; wordId++) {
+      if (dense[wordId] > 0) {
+        rowWordIds[j] = wordId;
+        rowCounts[j] = dense[wordId];
+        j++;
+      }
+    }
+
+    return { wordIds: rowWordIds, counts: rowCounts };
+  }
+
+  /**
+   * Convert a sparse row to a {wordId: value} object
+   * @param {Int32Array} wordIds - Word IDs
+   * @param {ArrayLike<number>} values - Value per word
+   * @returns {Object} Sparse vector as object
+   */
+  _rowToObject(wordIds, values) {
+    const vector = {};
+    for (let i = 0; i < wordIds.length; i++) {
+      vector[wordIds[i]] = values[i];
+    }
+    return vector;
+  }
+
+  /**
+   * Assemble sparse BoW rows into a CSR document-term matrix
+   * @param {Array<Object>} rows - {wordIds, counts} per document
+   * @returns {Object} {numDocs, indptr, indices, data}
+   */
+  _buildDocTermMatrix(rows) {
+    const indptr = new Int32Array(rows.length + 1);
+    for (let d = 0; d < rows.length; d++) {
+      indptr[d + 1] = indptr[d] + rows[d].wordIds.length;
+    }
 
-    for (let i = 0; i < numDesc; i++) {
-      const desc = descriptors.slice(i * descriptorSize, (i + 1) * descriptorSize);
-      const wordId = this.quantizeDescriptor(desc);
-      bow[wordId] = (bow[wordId] || 0) + 1;
+    const indices = new Int32Array(indptr[rows.length]);
+    const data = new Int32Array(indptr[rows.length]);
+    for (let d = 0; d < rows.length; d++) {
+      indices.set(rows[d].wordIds, indptr[d]);
+      data.set(rows[d].counts, indptr[d]);
     }
 
-    return bow;
+    return { numDocs: rows.length, indptr, indices, data };
+  }
+
+  /**
+   * Number of addressable vocabulary words
+   * Tree leaves can outnumber the nominal vocabularySize when it was capped
+   */
+  _numWords() {
+    return Math.max(this.vocabularySize, this.vocabulary ? this.vocabulary.length : 0);
   }
 
   /**
-   * Compute IDF weights
+   * Compute IDF weights from the CSR document-term matrix
+   * Each word appears at most once per row, so document frequency is a
+   * single histogram over the column indices
+   * @param {Object} docTermMatrix - From _buildDocTermMatrix
    */
-  computeIDF(targetBoWVectors) {
-    const N = targetBoWVectors.length;
-    const df = new Array(this.vocabularySize).fill(0);
+  computeIDF(docTermMatrix) {
+    const N = docTermMatrix.numDocs;
+    const indices = docTermMatrix.indices;
+    const df = new Int32Array(this._numWords());
 
     // Count document frequency for each word
-    for (const bow of targetBoWVectors) {
-      for (const wordId in bow) {
-        df[parseInt(wordId)]++;
-      }
+    for (let i = 0; i < indices.length; i++) {
+      df[indices[i]]++;
     }
 
     // Compute IDF weights
-    this.idfWeights = df.map(count => Math.log((N + 1) / (count + 1)));
+    this.idfWeights = Float64Array.from(df, count => Math.log((N + 1) / (count + 1)));
 
     console.log(`IDF weights computed for ${this.vocabularySize} words`);
   }
 
+  /**
+   * Weight every document of the CSR matrix in one pass over its entries
+   * Same formulas as computeTFIDFVector / computeBM25Vector
+   * @param {Object} docTermMatrix - From _buildDocTermMatrix
+   * @param {ArrayLike<number>} docLengths - Number of features per document
+   * @param {string} weightingScheme - 'bm25' or 'tfidf'
+   * @param {number} avgDocLength - Average document length (BM25 only)
+   * @returns {Array<Object>} Weighted vector per document as {wordId: weight}
+   */
+  _computeWeightedVectors(docTermMatrix, docLengths, weightingScheme, avgDocLength) {
+    const { numDocs, indptr, indices, data } = docTermMatrix;
+    const weights = new Float64Array(data.length);
+
+    // BM25 parameters (standard values from literature)
+    const k1 = 1.2; // Term saturation parameter (1.2-2.0)
+    const b = 0.75; // Length normalization (0.75 is standard)
+
+    for (let d = 0; d < numDocs; d++) {
+      const numFeatures = docLengths[d];
+      const lengthNorm = k1 * (1 - b + b * (numFeatures / avgDocLength));
+
+      for (let i = indptr[d]; i < indptr[d + 1]; i++) {
+        const count = data[i];
+        const idf = this.idfWeights[indices[i]] || 1.0;
+
+        if (weightingScheme === 'bm25') {
+          weights[i] = ((count * (k1 + 1)) / (count + lengthNorm)) * idf;
+        } else {
+          weights[i] = (count / numFeatures) * idf;
+        }
+      }
+    }
+
+    const vectors = [];
+    for (let d = 0; d < numDocs; d++) {
+      vectors.push(this._rowToObject(
+        indices.subarray(indptr[d], indptr[d + 1]),
+        weights.subarray(indptr[d], indptr[d + 1])
+      ));
+    }
+    return vectors;
+  }
+
   /**
    * Convert BoW to TF-IDF vector
    */
@@ -1216,30 +1606,83 @@ class VocabularyBuilder {
     this.onProgress({ stage: 'extracting', progress: 0 });
 
     // Step 1: Extract features from all targets
-    const allDescriptors = [];
     const targetFeatures = [];
     let descriptorSize = null;
 
-    for (let i = 0; i < targetData.length; i++) {
-      const { imageMat, targetId } = targetData[i];
+    // Hash one image at a time: each hash copies the full image out of the
+    // WASM heap. Only the IndexedDB reads overlap; cache misses need OpenCV
+    const pendingLookups = [];
+    for (const { imageMat } of targetData) {
+      const hash = this.cacheManager ? await this._computeFeatureCacheKey(imageMat) : null;
+      pendingLookups.push(this._lookupCachedFeatures(hash));
+    }
+    const lookups = await Promise.all(pendingLookups);
 
-      this.onProgress({
-        stage: 'extracting',
-        progress: ((i + 1) / targetData.length) * 100
-      });
+    // One ORB/TEBLID pair shared by every cache miss
+    const extractor = lookups.some(lookup => !lookup.features)
+      ? this._createFeatureExtractor()
+      : null;
+    const pendingStores = [];
+
+    try {
+      for (let i = 0; i < targetData.length; i++) {
+        const { imageMat, targetId } = targetData[i];
+        const { hash, features: cached } = lookups[i];
 
-      const features = this.extractFeatures(imageMat, targetId);
-      if (!features) continue;
+        this.onProgress({
+          stage: 'extracting',
+          progress: ((i + 1) / targetData.length) * 100
+        });
+
+        let features;
+        if (cached) {
+          console.log(`  ${targetId}: ${cached.numFeatures} features (cached)`);
+          features = {
+            id: targetId,
+            ...cached,
+            descriptors: this._asAlignedBytes(cached.descriptors)
+          };
+        } else {
+          features = this.extractFeatures(imageMat, targetId, extractor);
+          if (features && hash) {
+            pendingStores.push(this._storeCachedFeatures(hash, features));
+          }
+        }
+        if (!features) continue;
 
-      descriptorSize = features.descriptorSize;
-      targetFeatures.push(features);
-      allDescriptors.push(features.descriptors);
+        descriptorSize = features.descriptorSize;
+        targetFeatures.push(features);
+      }
+    } finally {
+      if (extractor) {
+        extractor.detector.delete();
+        extractor.descriptor.delete();
+      }
     }
 
-    if (allDescriptors.length === 0) {
+    await Promise.all(pendingStores);
+
+    if (targetFeatures.length === 0) {
       throw new Error('No features extracted from any target');
     }
 
+    // Batched Hamming kernels read descriptors as 32-bit words
+    if (descriptorSize % 4 !== 0) {
+      throw new Error(`Unsupported descriptor size: ${descriptorSize} bytes (must be a multiple of 4)`);
+    }
+
+    // Pack all descriptors into one preallocated buffer; targets keep views
+    // into it so the per-target copies can be released
+    const totalBytes = targetFeatures.reduce((sum, t) => sum + t.descriptors.length, 0);
+    const allDescriptors = new Uint8Array(totalBytes);
+    let offset = 0;
+    for (const target of targetFeatures) {
+      const length = target.descriptors.length;
+      allDescriptors.set(target.descriptors, offset);
+      target.descriptors = allDescriptors.subarray(offset, offset + length);
+      offset += length;
+    }
+
     // Step 2: Adaptive vocabulary sizing (if enabled)
     if (this.adaptiveVocabulary) {
       const avgFeatures = targetFeatures.reduce((sum, t) => sum + t.numFeatures, 0) / targetFeatures.length;
@@ -1258,12 +1701,12 @@ class VocabularyBuilder {
     this.onProgress({ stage: 'bow', progress: 0 });
     console.log('Converting to Bag-of-Words...');
 
-    const targetBoWVectors = [];
+    const bowRows = [];
     for (let i = 0; i < targetFeatures.length; i++) {
       const target = targetFeatures[i];
-      const bow = this.descriptorsToBoW(target.descriptors, descriptorSize);
-      target.bow = bow;
-      targetBoWVectors.push(bow);
+      const row = this._computeBoWRow(target.descriptors, descriptorSize);
+      target.bow = this._rowToObject(row.wordIds, row.counts);
+      bowRows.push(row);
 
       this.onProgress({
         stage: 'bow',
@@ -1271,9 +1714,12 @@ class VocabularyBuilder {
       });
     }
 
+    // Sparse document-term matrix (targets x words) in CSR layout
+    const docTermMatrix = this._buildDocTermMatrix(bowRows);
+
     // Step 4: Compute IDF
     this.onProgress({ stage: 'idf', progress: 0 });
-    this.computeIDF(targetBoWVectors);
+    this.computeIDF(docTermMatrix);
     this.onProgress({ stage: 'idf', progress: 100 });
 
     // Step 5: Choose weighting scheme (TF-IDF or BM25)
@@ -1285,25 +1731,20 @@ class VocabularyBuilder {
 
     this.onProgress({ stage: 'weighting', progress: 0 });
 
-    for (let i = 0; i < targetFeatures.length; i++) {
-      const target = targetFeatures[i];
-
-      if (weightingScheme === 'bm25') {
-        // Use BM25 weighting (better discrimination)
-        target.bow_tfidf = this.computeBM25Vector(target.bow, target.numFeatures, avgDocLength);
-        target.weighting_scheme = 'bm25';
-      } else {
-        // Use TF-IDF weighting (traditional)
-        target.bow_tfidf = this.computeTFIDFVector(target.bow, target.numFeatures);
-        target.weighting_scheme = 'tfidf';
-      }
+    const weightedVectors = this._computeWeightedVectors(
+      docTermMatrix,
+      targetFeatures.map(t => t.numFeatures),
+      weightingScheme,
+      avgDocLength
+    );
 
-      this.onProgress({
-        stage: 'weighting',
-        progress: ((i + 1) / targetFeatures.length) * 100
-      });
+    for (let i = 0; i < targetFeatures.length; i++) {
+      targetFeatures[i].bow_tfidf = weightedVectors[i];
+      targetFeatures[i].weighting_scheme = weightingScheme === 'bm25' ? 'bm25' : 'tfidf';
     }
 
+    this.onProgress({ stage: 'weighting', progress: 100 });
+
     console.log(`  Weighting scheme: ${weightingScheme.toUpperCase()}`);
     console.log(`  Average document length: ${avgDocLength.toFixed(1)} features`);
 
@@ -1327,7 +1768,10 @@ class VocabularyBuilder {
   }
 
   /**
-   * Export database in JSON format (includes hierarchical tree)
+   * Export database (includes hierarchical tree)
+   * Vocabulary words and target descriptors are exported as packed uint8
+   * blocks ({shape, dtype, data}) that reference the builder's buffers
+   * directly, so export does no per-byte conversion
    */
   exportDatabase() {
     const database = {
@@ -1345,7 +1789,10 @@ class VocabularyBuilder {
         created_at: new Date().toISOString()
       },
       vocabulary: {
-        words: this.vocabulary.map(word => Array.from(word)),
+        words: VocabularyBuilder.toPackedBlock(
+          this.vocabularyFlat,
+          this.vocabulary[0]?.length || 0
+        ),
         idf_weights: this.idfWeights,
         tree: this.vocabularyTree ? this._serializeTree(this.vocabularyTree) : null
       },
@@ -1354,12 +1801,7 @@ class VocabularyBuilder {
         filename: target.id, // Will be set by ZipDatabaseLoader
         num_features: target.numFeatures,
         keypoints: target.keypoints.map(kp => [kp.x, kp.y]),
-        descriptors: Array.from(target.descriptors).reduce((acc, val, i) => {
-          const idx = Math.floor(i / target.descriptorSize);
-          if (!acc[idx]) acc[idx] = [];
-          acc[idx].push(val);
-          return acc;
-        }, []),
+        descriptors: VocabularyBuilder.toPackedBlock(target.descriptors, target.descriptorSize),
         bow: target.bow,
         bow_tfidf: target.bow_tfidf,
         image_meta: {
@@ -1375,6 +1817,8 @@ class VocabularyBuilder {
 
   /**
    * Serialize tree structure for export
+   * Centers stay Uint8Arrays: IndexedDB's structured clone stores typed
+   * arrays as raw bytes, so no per-byte conversion is needed
    * @param {Object} node - Tree node
    * @returns {Object} Serialized node
    */
@@ -1382,7 +1826,7 @@ class VocabularyBuilder {
     return {
       level: node.level,
       isLeaf: node.isLeaf,
-      centers: node.centers.map(c => Array.from(c)),
+      centers: node.centers,
       children: node.children ? node.children.map(c => this._serializeTree(c)) : null
     };
   }
@@ -1431,18 +1875,22 @@ class VocabularyBuilder {
     this.levels = database.metadata.levels;
     this.vocabularySize = database.metadata.vocabulary_size;
 
-    // Restore vocabulary (convert arrays back to Uint8Arrays)
-    this.vocabulary = database.vocabulary.words.map(word =>
-      new Uint8Array(word)
+    // Restore vocabulary (row views over the packed words, no copy)
+    this.vocabularyFlat = VocabularyBuilder.fromPackedBlock(database.vocabulary.words);
+    this.vocabulary = VocabularyBuilder.unpackRows(
+      this.vocabularyFlat,
+      database.vocabulary.words.shape[1]
     );
     this.idfWeights = database.vocabulary.idf_weights;
 
     // Restore hierarchical tree if available
     if (database.vocabulary.tree) {
       this.vocabularyTree = this._deserializeTree(database.vocabulary.tree);
+      this.treeIndex = this._buildTreeIndex(this.vocabularyTree);
       console.log('[VocabularyBuilder] Hierarchical tree restored');
     } else {
       this.vocabularyTree = null;
+      this.treeIndex = null;
       console.log('[VocabularyBuilder] No hierarchical tree, using flat vocabulary');
     }
 
@@ -1450,13 +1898,9 @@ class VocabularyBuilder {
     this.targets = database.targets.map(target => {
       const descriptorSize = database.metadata.descriptor_bytes;
 
-      // Convert descriptors back to flat Uint8Array
-      const descriptorsFlat = new Uint8Array(
-        target.descriptors.length * descriptorSize
+      const descriptorsFlat = this._asAlignedBytes(
+        VocabularyBuilder.fromPackedBlock(target.descriptors)
       );
-      target.descriptors.forEach((desc, i) => {
-        descriptorsFlat.set(desc, i * descriptorSize);
-      });
 
       return {
         id: target.id,
@@ -1494,6 +1938,56 @@ class VocabularyBuilder {
   _sleep(ms) {
     return new Promise(resolve => setTimeout(resolve, ms));
   }
+
+  /**
+   * Wrap packed rows as a uint8 block for export
+   * IndexedDB's structured clone stores `data` as raw bytes
+   * @param {Uint8Array} bytes - Packed rows
+   * @param {number} rowSize - Bytes per row
+   * @returns {Object} {shape: [rows, rowSize], dtype: 'uint8', data}
+   */
+  static toPackedBlock(bytes, rowSize) {
+    return {
+      shape: [rowSize > 0 ? bytes.length / rowSize : 0, rowSize],
+      dtype: 'uint8',
+      data: bytes
+    };
+  }
+
+  /**
+   * Get the packed bytes of a uint8 block (no copy)
+   * @param {Object} block - Block from toPackedBlock
+   * @returns {Uint8Array} Packed rows
+   */
+  static fromPackedBlock(block) {
+    if (block.dtype !== 'uint8') {
+      throw new Error(`Unsupported packed block dtype: ${block.dtype}`);
+    }
+    if (!block.data) {
+      throw new Error('Packed block has no data');
+    }
+
+    const bytes = block.data instanceof Uint8Array ? block.data : new Uint8Array(block.data);
+    const [rows, rowSize] = block.shape;
+    if (bytes.length !== rows * rowSize) {
+      throw new Error(`Packed block size mismatch: ${bytes.length} bytes for shape [${rows}, ${rowSize}]`);
+    }
+    return bytes;
+  }
+
+  /**
+   * Split packed bytes into per-row views (no copy)
+   * @param {Uint8Array} packed - Packed rows
+   * @param {number} rowSize - Bytes per row
+   * @returns {Array<Uint8Array>} Row views
+   */
+  static unpackRows(packed, rowSize) {
+    const rows = [];
+    for (let offset = 0; offset < packed.length; offset += rowSize) {
+      rows.push(packed.subarray(offset, offset + rowSize));
+    }
+    return rows;
+  }
 }
 
 // Make available globally
@@ -8,6 +8,7 @@ class VocabularyTreeQuery {
     this.idf = idf; // Inverse document frequency weights
     this.vocabularySize = vocabulary.length;
     this.vocabularyTree = vocabularyTree; // Optional hierarchical tree for fast lookup
+    this.treeIndex = vocabularyTree ? this._buildTreeIndex(vocabularyTree) : null;
 
     // Convert vocabulary to OpenCV Mat for fast matching (fallback if no tree)
     this.vocabularyMat = this.createVocabularyMat(vocabulary);
@@ -68,18 +69,16 @@ class VocabularyTreeQuery {
    */
   _computeBoWHierarchical(descriptors) {
     const bow = {};
-    const descriptorSize = descriptors.cols;
+    const wordsPerDesc = descriptors.cols / 4;
+
+    // Copy descriptors out of the WASM heap once and read them as 32-bit words
+    const descWords = new Uint32Array(
+      descriptors.data.slice(0, descriptors.rows * descriptors.cols).buffer
+    );
 
     // Quantize each descriptor using tree traversal
     for (let i = 0; i < descriptors.rows; i++) {
-      // Extract descriptor as Uint8Array
-      const descriptor = new Uint8Array(descriptorSize);
-      for (let j = 0; j < descriptorSize; j++) {
-        descriptor[j] = descriptors.ucharAt(i, j);
-      }
-
-      // Quantize using hierarchical tree
-      const wordId = this._quantizeDescriptorHierarchical(descriptor, this.vocabularyTree, 0);
+      const wordId = this._quantizeDescriptorHierarchical(descWords, i * wordsPerDesc, wordsPerDesc);
       bow[wordId] = (bow[wordId] || 0) + 1;
     }
 
@@ -115,101 +114,94 @@ class VocabularyTreeQuery {
   }
 
   /**
-   * Hierarchical quantization - traverse tree from root to leaf
+   * Build packed tree index for quantization
+   * Same implementation as in VocabularyBuilder for consistency
+   * @param {Object} node - Serialized tree node
+   * @param {number} wordOffset - Word ID of the first leaf under this node
+   * @returns {Object} Indexed node {isLeaf, wordOffset, numWords, numCenters, centerWords, children}
+   */
+  _buildTreeIndex(node, wordOffset = 0) {
+    const numCenters = node.centers.length;
+    const descriptorSize = node.centers[0].length;
+    const centersFlat = new Uint8Array(numCenters * descriptorSize);
+    node.centers.forEach((center, i) => centersFlat.set(center, i * descriptorSize));
+
+    const indexed = {
+      isLeaf: node.isLeaf,
+      wordOffset,
+      numWords: numCenters,
+      numCenters,
+      centerWords: new Uint32Array(centersFlat.buffer),
+      children: null
+    };
+
+    if (!node.isLeaf) {
+      indexed.children = [];
+      indexed.numWords = 0;
+      for (const child of node.children || []) {
+        const indexedChild = this._buildTreeIndex(child, wordOffset + indexed.numWords);
+        indexed.numWords += indexedChild.numWords;
+        indexed.children.push(indexedChild);
+      }
+    }
+
+    return indexed;
+  }
+
+  /**
+   * Hierarchical quantization - descend from root to leaf
    * Same implementation as in VocabularyBuilder for consistency
-   * @param {Uint8Array} descriptor - Binary descriptor
-   * @param {Object} node - Current tree node
-   * @param {number} wordOffset - Offset for word ID calculation
+   * @param {Uint32Array} descWords - Descriptors as 32-bit words
+   * @param {number} descOffset - Word offset of the descriptor
+   * @param {number} wordsPerDesc - Words per descriptor
    * @returns {number} Word ID
    */
-  _quantizeDescriptorHierarchical(descriptor, node, wordOffset) {
-    // If leaf node, find best matching word among leaf centers
-    if (node.isLeaf) {
+  _quantizeDescriptorHierarchical(descWords, descOffset, wordsPerDesc) {
+    let node = this.treeIndex;
+
+    while (node) {
+      const centerWords = node.centerWords;
       let minDist = Infinity;
-      let bestLocalIdx = 0;
+      let bestIdx = 0;
 
-      for (let i = 0; i < node.centers.length; i++) {
-        const dist = this._hammingDistance(descriptor, node.centers[i]);
+      for (let i = 0; i < node.numCenters; i++) {
+        const centerOffset = i * wordsPerDesc;
+        let dist = 0;
+        for (let w = 0; w < wordsPerDesc; w++) {
+          dist += this._popcount32(descWords[descOffset + w] ^ centerWords[centerOffset + w]);
+        }
         if (dist < minDist) {
           minDist = dist;
-          bestLocalIdx = i;
+          bestIdx = i;
         }
       }
 
-      return wordOffset + bestLocalIdx;
-    }
-
-    // Internal node: find best matching child center
-    let minDist = Infinity;
-    let bestChildIdx = 0;
-
-    for (let i = 0; i < node.centers.length; i++) {
-      const dist = this._hammingDistance(descriptor, node.centers[i]);
-      if (dist < minDist) {
-        minDist = dist;
-        bestChildIdx = i;
+      // Leaf node: best center is the vocabulary word
+      if (node.isLeaf) {
+        return node.wordOffset + bestIdx;
       }
-    }
 
-    // Calculate word offset for the chosen subtree
-    let subtreeSize = 0;
-    if (node.children && node.children.length > 0) {
-      // Count words in previous siblings
-      for (let i = 0; i < bestChildIdx && i < node.children.length; i++) {
-        subtreeSize += this._countWords(node.children[i]);
+      // Shouldn't happen, but fall back to the subtree's first word
+      if (!node.children || !node.children[bestIdx]) {
+        return node.wordOffset;
       }
-    }
-
-    // Recurse into best matching child
-    if (node.children && node.children[bestChildIdx]) {
-      return this._quantizeDescriptorHierarchical(
-        descriptor,
-        node.children[bestChildIdx],
-        wordOffset + subtreeSize
-      );
-    }
 
-    // Shouldn't reach here, but return offset as fallback
-    return wordOffset;
-  }
-
-  /**
-   * Count total vocabulary words in a subtree
-   * @param {Object} node - Tree node
-   * @returns {number} Number of words
-   */
-  _countWords(node) {
-    if (node.isLeaf) {
-      return node.centers.length;
+      node = node.children[bestIdx];
     }
 
-    let count = 0;
-    if (node.children) {
-      for (const child of node.children) {
-        count += this._countWords(child);
-      }
-    }
-    return count;
+    return 0;
   }
 
   /**
-   * Hamming distance between two binary descriptors
-   * @param {Uint8Array} a - First descriptor
-   * @param {Uint8Array} b - Second descriptor
-   * @returns {number} Hamming distance
+   * Number of set bits in a 32-bit integer (SWAR popcount)
+   * @param {number} x - 32-bit value
+   * @returns {number} Set bit count
    */
-  _hammingDistance(a, b) {
-    let dist = 0;
-    for (let i = 0; i < a.length; i++) {
-      const xor = a[i] ^ b[i];
-      // Count set bits (popcount)
-      let count = xor;
-      count = count - ((count >> 1) & 0x55);
-      count = (count & 0x33) + ((count >> 2) & 0x33);
-      count = (count + (count >> 4)) & 0x0f;
-      dist += count;
-    }
-    return dist;
+  _popcount32(x) {
+    x = x - ((x >>> 1) & 0x55555555);
+    x = (x & 0x33333333) + ((x >>> 2) & 0x33333333);
+    x = (x + (x >>> 4)) & 0x0f0f0f0f;
+    return Math.imul(x, 0x01010101) >>> 24;
   }
 
   /**
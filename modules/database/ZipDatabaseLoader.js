@@ -248,7 +248,11 @@ class ZipDatabaseLoader {
   _initializeVocabularyQuery() {
     try {
       // VocabularyTreeQuery expects vocabulary as array of arrays (not Mats)
-      const vocabulary = this.database.vocabulary.words;
+      const words = this.database.vocabulary.words;
+      const vocabulary = VocabularyBuilder.unpackRows(
+        VocabularyBuilder.fromPackedBlock(words),
+        words.shape[1]
+      );
       const idf = this.database.vocabulary.idf_weights;
       const vocabularyTree = this.database.vocabulary.tree || null;
 
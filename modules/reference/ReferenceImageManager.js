@@ -210,16 +210,10 @@ class ReferenceImageManager {
             keypoints.push_back(kp);
         }
 
-        // Convert descriptors to cv.Mat
-        const descriptorSize = database.metadata.descriptor_bytes;
-        const numDescriptors = targetData.descriptors.length;
+        // Convert descriptors to cv.Mat (packed uint8 block)
+        const [numDescriptors, descriptorSize] = targetData.descriptors.shape;
         const descriptors = new cv.Mat(numDescriptors, descriptorSize, cv.CV_8U);
-
-        for (let i = 0; i < numDescriptors; i++) {
-            for (let j = 0; j < descriptorSize; j++) {
-                descriptors.ucharPtr(i, j)[0] = targetData.descriptors[i][j];
-            }
-        }
+        descriptors.data.set(VocabularyBuilder.fromPackedBlock(targetData.descriptors));
 
         // Create a mock image object with dimensions (needed for corner calculation)
         const imageMeta = targetData.image_meta || { width: 640, height: 480 };